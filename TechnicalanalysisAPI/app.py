@@ -1,433 +1,791 @@
-from flask import Flask, request, jsonify
-from flask_cors import CORS
-import yfinance as yf
-import pandas as pd
-import numpy as np
-import requests
-import math
-import os
-
-app = Flask(__name__)
-CORS(app)
-
-def safe_float(value, default=0.0):
-    """Safely convert value to float, handling NaN and Infinity"""
-    if pd.isna(value) or math.isinf(value) or math.isnan(value):
-        return default
-    return float(value)
-
-def calculate_rsi(data, period=14):
-    """Calculate RSI with safe handling"""
-    try:
-        delta = data['Close'].diff()
-        gain = delta.where(delta > 0, 0)
-        loss = -delta.where(delta < 0, 0)
-        
-        avg_gain = gain.rolling(window=period).mean()
-        avg_loss = loss.rolling(window=period).mean()
-        avg_loss = avg_loss.replace(0, 0.01)
-        
-        rs = avg_gain / avg_loss
-        rsi = 100 - (100 / (1 + rs))
-        
-        result = rsi.iloc[-1] if len(rsi) > 0 else 50
-        return safe_float(result, 50)
-    except Exception:
-        return 50
-
-def calculate_macd(data, fast=12, slow=26, signal=9):
-    """Calculate MACD with safe handling"""
-    try:
-        exp1 = data['Close'].ewm(span=fast).mean()
-        exp2 = data['Close'].ewm(span=slow).mean()
-        macd_line = exp1 - exp2
-        signal_line = macd_line.ewm(span=signal).mean()
-        histogram = macd_line - signal_line
-        
-        return {
-            'macd': safe_float(macd_line.iloc[-1], 0),
-            'signal': safe_float(signal_line.iloc[-1], 0),
-            'histogram': safe_float(histogram.iloc[-1], 0)
-        }
-    except Exception:
-        return {'macd': 0, 'signal': 0, 'histogram': 0}
-
-def calculate_bollinger_bands(data, period=20, std_dev=2):
-    """Calculate Bollinger Bands with safe handling"""
-    try:
-        sma = data['Close'].rolling(window=period).mean()
-        std = data['Close'].rolling(window=period).std()
-        
-        upper_band = sma + (std * std_dev)
-        lower_band = sma - (std * std_dev)
-        current_price = data['Close'].iloc[-1]
-        
-        return {
-            'upper': safe_float(upper_band.iloc[-1], current_price * 1.1),
-            'middle': safe_float(sma.iloc[-1], current_price),
-            'lower': safe_float(lower_band.iloc[-1], current_price * 0.9),
-            'current': safe_float(current_price, 0)
-        }
-    except Exception:
-        current_price = safe_float(data['Close'].iloc[-1], 100)
-        return {
-            'upper': current_price * 1.1,
-            'middle': current_price,
-            'lower': current_price * 0.9,
-            'current': current_price
-        }
-
-def calculate_moving_average_crossover(data, short=50, long=200):
-    """Calculate Moving Average Crossover with safe handling"""
-    try:
-        if len(data) < long:
-            short, long = min(5, len(data)//2), min(10, len(data)-1)
-        
-        short_ma = data['Close'].rolling(window=short).mean()
-        long_ma = data['Close'].rolling(window=long).mean()
-        
-        short_val = safe_float(short_ma.iloc[-1], data['Close'].iloc[-1])
-        long_val = safe_float(long_ma.iloc[-1], data['Close'].iloc[-1])
-        
-        return {
-            'short_ma': short_val,
-            'long_ma': long_val,
-            'crossover': short_val > long_val
-        }
-    except Exception:
-        current_price = safe_float(data['Close'].iloc[-1], 100)
-        return {
-            'short_ma': current_price,
-            'long_ma': current_price,
-            'crossover': False
-        }
-
-def calculate_volatility(data, period=14):
-    """Calculate Volatility with safe handling"""
-    try:
-        if len(data) < period:
-            return 2.0
-        
-        high_low = data['High'] - data['Low']
-        high_close = np.abs(data['High'] - data['Close'].shift())
-        low_close = np.abs(data['Low'] - data['Close'].shift())
-        
-        true_range = pd.concat([high_low, high_close, low_close], axis=1).max(axis=1)
-        atr = true_range.rolling(window=period).mean()
-        
-        current_price = safe_float(data['Close'].iloc[-1], 100)
-        atr_val = safe_float(atr.iloc[-1], current_price * 0.02)
-        
-        if current_price <= 0:
-            return 2.0
-        
-        volatility_pct = (atr_val / current_price) * 100
-        return safe_float(volatility_pct, 2.0)
-    except Exception:
-        return 2.0
-
-def get_indicator_signals(indicators):
-    """Get individual indicator signals"""
-    signals = {}
-    
-    # RSI Signal
-    rsi = indicators['rsi']
-    if rsi < 30:
-        signals['rsi'] = 'Buy'
-    elif rsi > 70:
-        signals['rsi'] = 'Sell'
-    else:
-        signals['rsi'] = 'Hold'
-    
-    # MACD Signal
-    macd_data = indicators['macd']
-    if macd_data['macd'] > macd_data['signal'] and macd_data['histogram'] > 0:
-        signals['macd'] = 'Buy'
-    elif macd_data['macd'] < macd_data['signal'] and macd_data['histogram'] < 0:
-        signals['macd'] = 'Sell'
-    else:
-        signals['macd'] = 'Hold'
-    
-    # Moving Average Signal
-    ma_data = indicators['moving_average']
-    if ma_data['crossover']:
-        signals['moving_average'] = 'Buy'
-    else:
-        signals['moving_average'] = 'Sell'
-    
-    # Bollinger Bands Signal
-    bb_data = indicators['bollinger_bands']
-    if bb_data['current'] < bb_data['lower']:
-        signals['bollinger_bands'] = 'Buy'
-    elif bb_data['current'] > bb_data['upper']:
-        signals['bollinger_bands'] = 'Sell'
-    else:
-        signals['bollinger_bands'] = 'Hold'
-    
-    # Volatility Signal
-    volatility = indicators['volatility']
-    if volatility > 5:
-        signals['volatility'] = 'Sell'
-    elif volatility < 2:
-        signals['volatility'] = 'Buy'
-    else:
-        signals['volatility'] = 'Hold'
-    
-    return signals
-
-def calculate_final_suggestion(signals):
-    """Calculate final suggestion based on priority system"""
-    buy_count = sum(1 for signal in signals.values() if signal == 'Buy')
-    sell_count = sum(1 for signal in signals.values() if signal == 'Sell')
-    
-    if buy_count >= 3:
-        return 'Strong Buy'
-    elif sell_count >= 3:
-        return 'Strong Sell'
-    elif buy_count > sell_count:
-        return 'Buy'
-    elif sell_count > buy_count:
-        return 'Sell'
-    else:
-        return 'Hold'
-
-# Comprehensive Indian stocks database
-INDIAN_STOCKS = [
-    {'symbol': 'RELIANCE.NS', 'name': 'Reliance Industries Ltd'},
-    {'symbol': 'TCS.NS', 'name': 'Tata Consultancy Services Ltd'},
-    {'symbol': 'HDFCBANK.NS', 'name': 'HDFC Bank Ltd'},
-    {'symbol': 'ICICIBANK.NS', 'name': 'ICICI Bank Ltd'},
-    {'symbol': 'SBIN.NS', 'name': 'State Bank of India'},
-    {'symbol': 'INFY.NS', 'name': 'Infosys Ltd'},
-    {'symbol': 'HINDUNILVR.NS', 'name': 'Hindustan Unilever Ltd'},
-    {'symbol': 'ITC.NS', 'name': 'ITC Ltd'},
-    {'symbol': 'KOTAKBANK.NS', 'name': 'Kotak Mahindra Bank Ltd'},
-    {'symbol': 'AXISBANK.NS', 'name': 'Axis Bank Ltd'},
-    {'symbol': 'LT.NS', 'name': 'Larsen & Toubro Ltd'},
-    {'symbol': 'WIPRO.NS', 'name': 'Wipro Ltd'},
-    {'symbol': 'MARUTI.NS', 'name': 'Maruti Suzuki India Ltd'},
-    {'symbol': 'BAJFINANCE.NS', 'name': 'Bajaj Finance Ltd'},
-    {'symbol': 'HCLTECH.NS', 'name': 'HCL Technologies Ltd'},
-    {'symbol': 'ASIANPAINT.NS', 'name': 'Asian Paints Ltd'},
-    {'symbol': 'BHARTIARTL.NS', 'name': 'Bharti Airtel Ltd'},
-    {'symbol': 'SUNPHARMA.NS', 'name': 'Sun Pharmaceutical Industries Ltd'},
-    {'symbol': 'TITAN.NS', 'name': 'Titan Company Ltd'},
-    {'symbol': 'ULTRACEMCO.NS', 'name': 'UltraTech Cement Ltd'},
-    {'symbol': 'NESTLEIND.NS', 'name': 'Nestle India Ltd'},
-    {'symbol': 'POWERGRID.NS', 'name': 'Power Grid Corporation of India Ltd'},
-    {'symbol': 'NTPC.NS', 'name': 'NTPC Ltd'},
-    {'symbol': 'ONGC.NS', 'name': 'Oil and Natural Gas Corporation Ltd'},
-    {'symbol': 'TATASTEEL.NS', 'name': 'Tata Steel Ltd'},
-    {'symbol': 'TECHM.NS', 'name': 'Tech Mahindra Ltd'},
-    {'symbol': 'JSWSTEEL.NS', 'name': 'JSW Steel Ltd'},
-    {'symbol': 'INDUSINDBK.NS', 'name': 'IndusInd Bank Ltd'},
-    {'symbol': 'DRREDDY.NS', 'name': 'Dr. Reddy\'s Laboratories Ltd'},
-    {'symbol': 'CIPLA.NS', 'name': 'Cipla Ltd'},
-    {'symbol': 'ADANIPORTS.NS', 'name': 'Adani Ports and SEZ Ltd'},
-    {'symbol': 'ADANIGREEN.NS', 'name': 'Adani Green Energy Ltd'},
-    {'symbol': 'BAJAJ-AUTO.NS', 'name': 'Bajaj Auto Ltd'},
-    {'symbol': 'BPCL.NS', 'name': 'Bharat Petroleum Corporation Ltd'},
-    {'symbol': 'COALINDIA.NS', 'name': 'Coal India Ltd'},
-    {'symbol': 'DIVISLAB.NS', 'name': 'Divi\'s Laboratories Ltd'},
-    {'symbol': 'EICHERMOT.NS', 'name': 'Eicher Motors Ltd'},
-    {'symbol': 'GRASIM.NS', 'name': 'Grasim Industries Ltd'},
-    {'symbol': 'HDFCLIFE.NS', 'name': 'HDFC Life Insurance Company Ltd'},
-    {'symbol': 'HEROMOTOCO.NS', 'name': 'Hero MotoCorp Ltd'},
-    {'symbol': 'HINDALCO.NS', 'name': 'Hindalco Industries Ltd'},
-    {'symbol': 'IOC.NS', 'name': 'Indian Oil Corporation Ltd'},
-    {'symbol': 'M&M.NS', 'name': 'Mahindra & Mahindra Ltd'},
-    {'symbol': 'SBILIFE.NS', 'name': 'SBI Life Insurance Company Ltd'},
-    {'symbol': 'TATACONSUM.NS', 'name': 'Tata Consumer Products Ltd'},
-    {'symbol': 'TATAMOTORS.NS', 'name': 'Tata Motors Ltd'},
-    {'symbol': 'UPL.NS', 'name': 'UPL Ltd'},
-    {'symbol': 'VEDL.NS', 'name': 'Vedanta Ltd'},
-    {'symbol': 'APOLLOHOSP.NS', 'name': 'Apollo Hospitals Enterprise Ltd'},
-    {'symbol': 'BRITANNIA.NS', 'name': 'Britannia Industries Ltd'},
-    {'symbol': 'DABUR.NS', 'name': 'Dabur India Ltd'},
-    {'symbol': 'GODREJCP.NS', 'name': 'Godrej Consumer Products Ltd'},
-    {'symbol': 'MARICO.NS', 'name': 'Marico Ltd'},
-    {'symbol': 'PIDILITIND.NS', 'name': 'Pidilite Industries Ltd'},
-    {'symbol': 'DMART.NS', 'name': 'Avenue Supermarts Limited'},
-    {'symbol': 'BANDHANBNK.NS', 'name': 'Bandhan Bank Ltd'},
-    {'symbol': 'FEDERALBNK.NS', 'name': 'Federal Bank Ltd'},
-    {'symbol': 'IDFCFIRSTB.NS', 'name': 'IDFC First Bank Ltd'},
-    {'symbol': 'PNB.NS', 'name': 'Punjab National Bank'},
-    {'symbol': 'CANBK.NS', 'name': 'Canara Bank'},
-    {'symbol': 'BANKBARODA.NS', 'name': 'Bank of Baroda'},
-    {'symbol': 'YESBANK.NS', 'name': 'Yes Bank Ltd'},
-    {'symbol': 'MINDTREE.NS', 'name': 'Mindtree Ltd'},
-    {'symbol': 'MPHASIS.NS', 'name': 'Mphasis Ltd'},
-    {'symbol': 'LTI.NS', 'name': 'L&T Infotech Ltd'},
-    {'symbol': 'COFORGE.NS', 'name': 'Coforge Ltd'},
-    {'symbol': 'ASHOKLEY.NS', 'name': 'Ashok Leyland Ltd'},
-    {'symbol': 'TVSMOTOR.NS', 'name': 'TVS Motor Company Ltd'},
-    {'symbol': 'BAJAJFINSV.NS', 'name': 'Bajaj Finserv Ltd'},
-    {'symbol': 'LUPIN.NS', 'name': 'Lupin Ltd'},
-    {'symbol': 'BIOCON.NS', 'name': 'Biocon Ltd'},
-    {'symbol': 'CADILAHC.NS', 'name': 'Cadila Healthcare Ltd'},
-    {'symbol': 'TORNTPHARM.NS', 'name': 'Torrent Pharmaceuticals Ltd'},
-    {'symbol': 'COLPAL.NS', 'name': 'Colgate Palmolive India Ltd'},
-    {'symbol': 'JUBLFOOD.NS', 'name': 'Jubilant FoodWorks Ltd'},
-    {'symbol': 'ZEEL.NS', 'name': 'Zee Entertainment Enterprises Ltd'},
-    {'symbol': 'SAIL.NS', 'name': 'Steel Authority of India Ltd'},
-    {'symbol': 'GMRINFRA.NS', 'name': 'GMR Infrastructure Ltd'},
-    {'symbol': 'RPOWER.NS', 'name': 'Reliance Power Ltd'},
-    {'symbol': 'SUZLON.NS', 'name': 'Suzlon Energy Ltd'},
-    {'symbol': 'FORCEMOT.NS', 'name': 'Force Motors Ltd'},
-]
-
-def search_yahoo_finance_api(query):
-    """Search using Yahoo Finance API with proper error handling"""
-    try:
-        url = f"https://query1.finance.yahoo.com/v1/finance/search?q={query}&quotesCount=10&newsCount=0"
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        
-        response = requests.get(url, headers=headers, timeout=5)
-        
-        if response.status_code == 200:
-            data = response.json()
-            stocks = []
-            
-            for quote in data.get('quotes', []):
-                symbol = quote.get('symbol', '')
-                if symbol.endswith(('.NS', '.BO')):
-                    stocks.append({
-                        'symbol': symbol,
-                        'name': quote.get('longname', quote.get('shortname', symbol))
-                    })
-            
-            return stocks
-        else:
-            return []
-            
-    except Exception as e:
-        return []
-
-@app.route('/search', methods=['GET'])
-def search_stocks():
-    """Search stocks with fallback to local database"""
-    query = request.args.get('q', '').strip().upper()
-    
-    if len(query) < 2:
-        return jsonify([])
-    
-    try:
-        # First try Yahoo Finance API
-        live_results = search_yahoo_finance_api(query)
-        
-        # Search local database
-        local_results = []
-        for stock in INDIAN_STOCKS:
-            if (query in stock['symbol'].upper() or 
-                query in stock['name'].upper() or
-                any(word.startswith(query) for word in stock['name'].upper().split())):
-                local_results.append(stock)
-        
-        # Combine and remove duplicates
-        all_results = live_results + local_results
-        seen = set()
-        unique_results = []
-        for stock in all_results:
-            if stock['symbol'] not in seen:
-                seen.add(stock['symbol'])
-                unique_results.append(stock)
-        
-        return jsonify(unique_results[:10])
-        
-    except Exception as e:
-        return jsonify({'error': f'Search failed: {str(e)}'}), 500
-
-@app.route('/analyze', methods=['POST'])
-def analyze():
-    """Analyze stock with comprehensive error handling"""
-    try:
-        data = request.get_json()
-        if not data:
-            return jsonify({'error': 'No JSON data provided'}), 400
-        
-        symbol = data.get('symbol')
-        if not symbol:
-            return jsonify({'error': 'No stock symbol provided'}), 400
-        
-        # Fetch stock data from Yahoo Finance
-        stock = yf.Ticker(symbol)
-        hist = stock.history(period='1y')
-        
-        if len(hist) < 20:
-            return jsonify({'error': f'Insufficient data for {symbol}. Stock may not exist.'}), 400
-        
-        current_price = safe_float(hist['Close'].iloc[-1], 0)
-        
-        if current_price <= 0:
-            return jsonify({'error': f'Invalid price data for {symbol}'}), 400
-        
-        # Get company info safely
-        try:
-            stock_info = stock.info
-            company_name = stock_info.get('longName', symbol) if stock_info else symbol
-        except Exception:
-            company_name = symbol
-        
-        # Calculate all indicators
-        indicators = {
-            'rsi': calculate_rsi(hist),
-            'macd': calculate_macd(hist),
-            'moving_average': calculate_moving_average_crossover(hist),
-            'bollinger_bands': calculate_bollinger_bands(hist),
-            'volatility': calculate_volatility(hist)
-        }
-        
-        signals = get_indicator_signals(indicators)
-        final_suggestion = calculate_final_suggestion(signals)
-        
-        response_data = {
-            'stock': symbol,
-            'company_name': company_name,
-            'current_price': round(current_price, 2),
-            'indicators': {
-                'rsi': {
-                    'value': round(indicators['rsi'], 2),
-                    'signal': signals['rsi']
-                },
-                'macd': {
-                    'value': round(indicators['macd']['histogram'], 4),
-                    'signal': signals['macd']
-                },
-                'moving_average': {
-                    'short_ma': round(indicators['moving_average']['short_ma'], 2),
-                    'long_ma': round(indicators['moving_average']['long_ma'], 2),
-                    'signal': signals['moving_average']
-                },
-                'bollinger_bands': {
-                    'current': round(indicators['bollinger_bands']['current'], 2),
-                    'upper': round(indicators['bollinger_bands']['upper'], 2),
-                    'lower': round(indicators['bollinger_bands']['lower'], 2),
-                    'signal': signals['bollinger_bands']
-                },
-                'volatility': {
-                    'value': round(indicators['volatility'], 2),
-                    'signal': signals['volatility']
-                }
-            },
-            'final_suggestion': final_suggestion,
-            'signal_summary': {
-                'buy_count': sum(1 for signal in signals.values() if signal == 'Buy'),
-                'sell_count': sum(1 for signal in signals.values() if signal == 'Sell'),
-                'hold_count': sum(1 for signal in signals.values() if signal == 'Hold')
-            }
-        }
-        
-        return jsonify(response_data)
-        
-    except Exception as e:
-        return jsonify({'error': f'Analysis failed: {str(e)}'}), 500
-@app.route('/')
-def home():
-    return "API is working"
-
-
-
-if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=int(os.environ.get("PORT", 10000)))
+from flask import Flask, request, jsonify
+from flask.json.provider import JSONProvider
+from flask_compress import Compress
+from flask_cors import CORS
+import orjson
+import yfinance as yf
+import pandas as pd
+import numpy as np
+import requests
+import math
+import os
+from bisect import bisect_left
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from cachetools import LRUCache, TTLCache
+from scipy.signal import lfilter
+from threading import Lock
+from urllib.parse import quote_plus
+
+from indicators import indicator_kernel as _indicator_kernel_py
+
+# Jit-compile the kernel with a persistent on-disk cache; running
+# build_indicators.py at image assembly seeds that cache so this
+# import-time warmup loads machine code instead of compiling. Falls
+# back to the per-indicator NumPy path when numba is absent.
+try:
+    from numba import njit
+    _indicator_kernel = njit(cache=True, fastmath=True)(_indicator_kernel_py)
+    # Warm at import (with the float32 arrays the caches store) so the
+    # first request does not pay compilation
+    _warm = np.zeros(21, dtype=np.float32)
+    _indicator_kernel(_warm, _warm, _warm, 14, 20, 5, 10, 14)
+    _HAS_KERNEL = True
+except ImportError:
+    _HAS_KERNEL = False
+
+class OrjsonProvider(JSONProvider):
+    """Flask JSON provider backed by orjson's native serializer"""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+app = Flask(__name__)
+app.json = OrjsonProvider(app)
+app.config['COMPRESS_ALGORITHM'] = ['br', 'gzip']
+app.config['COMPRESS_MIN_SIZE'] = 500
+CORS(app)
+Compress(app)
+
+# In-process caches: price history for 5 minutes, company names for an hour.
+# Entries hold plain arrays/strings rather than DataFrames to stay small.
+_HIST_CACHE = TTLCache(maxsize=1024, ttl=300)
+_INFO_CACHE = TTLCache(maxsize=1024, ttl=3600)
+_CACHE_LOCK = Lock()
+
+# Long-lived (entry, bar_dates) per symbol: when the TTL entry expires we
+# advance these arrays by the few bars that actually changed instead of
+# re-downloading a full year. Capped like _HIST_CACHE so junk symbols
+# cannot grow it without bound.
+_HIST_STATE = LRUCache(maxsize=1024)
+
+# The longest indicator lookback is the 200-day SMA; keep a small buffer
+# and drop older bars at ingest. (A '9mo' fetch would fall short of 200
+# sessions, so we still request 1y and trim.)
+_REQUIRED_BARS = 200 + 22
+
+def _history_entry(hist):
+    """Build a cache entry of sanitized float32 arrays plus the last bar date.
+
+    NaN/Inf are scrubbed to 0.0 here, once per ingest, so the indicator
+    kernels can trust every element downstream and an invalid last close
+    still trips the zero-price guard in /analyze.
+    """
+    def clean(column):
+        return np.nan_to_num(hist[column].to_numpy(dtype=np.float32),
+                             copy=False, nan=0.0, posinf=0.0, neginf=0.0)
+
+    return (
+        clean('Close'),
+        clean('High'),
+        clean('Low'),
+        str(hist.index[-1].date()) if len(hist) else ''
+    )
+
+def _store_history(symbol, hist):
+    """Cache a freshly downloaded history and remember its bar dates"""
+    hist = hist.tail(_REQUIRED_BARS)
+    entry = _history_entry(hist)
+    dates = [str(d.date()) for d in hist.index]
+    with _CACHE_LOCK:
+        _HIST_CACHE[symbol] = entry
+        # Histories too short to analyze (unknown symbols mostly) are not
+        # worth advancing incrementally
+        if len(entry[0]) >= 20:
+            _HIST_STATE[symbol] = (entry, dates)
+        else:
+            _HIST_STATE.pop(symbol, None)
+    return entry
+
+def _advance_history(symbol, state):
+    """Advance retained history by only the bars since the last one seen.
+
+    Fetches a few recent sessions, replaces any cached bars they overlap
+    (today's bar keeps moving intraday) and appends the rest. Returns the
+    refreshed cache entry, or None when the gap exceeds the fetch window
+    and a full download is needed.
+    """
+    (close, high, low, _), dates = state
+    recent = yf.Ticker(symbol).history(period='5d', actions=False)
+    if len(recent) == 0:
+        return None
+
+    recent_dates = [str(d.date()) for d in recent.index]
+    if recent_dates[0] > dates[-1]:
+        return None
+
+    cut = bisect_left(dates, recent_dates[0])
+    r_close, r_high, r_low, last_bar = _history_entry(recent)
+
+    # Validate the overlap by value, not just date: auto-adjusted prices
+    # are re-based across the whole series after a dividend or split, and
+    # splicing new-basis bars onto an old-basis window would leave a
+    # permanent discontinuity in the retained arrays. Any mismatch means
+    # the cached basis is stale, so force a full refetch.
+    overlap = len(dates) - cut
+    if (dates[cut:] != recent_dates[:overlap] or
+            not np.allclose(close[cut:], r_close[:overlap], rtol=1e-3)):
+        return None
+
+    entry = (
+        np.concatenate([close[:cut], r_close])[-_REQUIRED_BARS:],
+        np.concatenate([high[:cut], r_high])[-_REQUIRED_BARS:],
+        np.concatenate([low[:cut], r_low])[-_REQUIRED_BARS:],
+        last_bar
+    )
+    with _CACHE_LOCK:
+        _HIST_CACHE[symbol] = entry
+        _HIST_STATE[symbol] = (entry, (dates[:cut] + recent_dates)[-_REQUIRED_BARS:])
+    return entry
+
+def _fetch_history(symbol):
+    """Return (close, high, low, last_bar) arrays for symbol, cached with TTL"""
+    with _CACHE_LOCK:
+        entry = _HIST_CACHE.get(symbol)
+        state = _HIST_STATE.get(symbol) if entry is None else None
+    if entry is not None:
+        return entry
+    if state is not None:
+        try:
+            entry = _advance_history(symbol, state)
+        except Exception:
+            entry = None
+        if entry is not None:
+            return entry
+    return _store_history(symbol, yf.Ticker(symbol).history(period='1y', actions=False))
+
+def _get_company_name(symbol):
+    """Look up the company long name for symbol, cached with TTL"""
+    with _CACHE_LOCK:
+        name = _INFO_CACHE.get(symbol)
+    if name is None:
+        try:
+            stock_info = yf.Ticker(symbol).info
+            name = stock_info.get('longName', symbol) if stock_info else symbol
+        except Exception:
+            name = symbol
+        with _CACHE_LOCK:
+            _INFO_CACHE[symbol] = name
+    return name
+
+def safe_float(value, default=0.0):
+    """Safely convert value to float, handling NaN and Infinity"""
+    if pd.isna(value) or math.isinf(value) or math.isnan(value):
+        return default
+    return float(value)
+
+def _sma_last(x, w):
+    """Last value of a w-period simple moving average via running sums"""
+    cs = np.cumsum(x, dtype=np.float64)
+    if len(x) > w:
+        return (cs[-1] - cs[-w - 1]) / w
+    return cs[-1] / len(x)
+
+def _std_last(x, w, ddof=1):
+    """Last value of a w-period rolling standard deviation"""
+    window = x[-w:]
+    mean = np.add.reduce(window) / len(window)
+    return math.sqrt(np.add.reduce((window - mean) ** 2) / (len(window) - ddof))
+
+def calculate_rsi(close, period=14):
+    """Calculate RSI from a close-price array with safe handling"""
+    try:
+        delta = np.diff(close)
+        gain = np.where(delta > 0, delta, 0.0)
+        loss = np.where(delta < 0, -delta, 0.0)
+
+        avg_gain = _sma_last(gain, period)
+        avg_loss = _sma_last(loss, period)
+        if avg_loss == 0:
+            avg_loss = 0.01
+
+        rs = avg_gain / avg_loss
+        rsi = 100 - (100 / (1 + rs))
+        return safe_float(rsi, 50)
+    except Exception:
+        return 50
+
+def _ema(x, span):
+    """Exponential moving average as a single-pole IIR filter.
+
+    Equivalent to pandas ewm(span=span).mean(): the weighted sum and the
+    weight total are each one lfilter pass, so no Python-level loop runs.
+    """
+    alpha = 2.0 / (span + 1)
+    a = [1.0, alpha - 1.0]
+    num = lfilter([1.0], a, x)
+    den = lfilter([1.0], a, np.ones(len(x)))
+    return num / den
+
+def calculate_macd(close, fast=12, slow=26, signal=9):
+    """Calculate MACD from a close-price array with safe handling"""
+    try:
+        macd_line = _ema(close, fast) - _ema(close, slow)
+        signal_line = _ema(macd_line, signal)
+        histogram = macd_line - signal_line
+
+        return {
+            'macd': safe_float(macd_line[-1], 0),
+            'signal': safe_float(signal_line[-1], 0),
+            'histogram': safe_float(histogram[-1], 0)
+        }
+    except Exception:
+        return {'macd': 0, 'signal': 0, 'histogram': 0}
+
+def calculate_bollinger_bands(close, period=20, std_dev=2):
+    """Calculate Bollinger Bands from a close-price array with safe handling"""
+    try:
+        sma = _sma_last(close, period)
+        std = _std_last(close, period)
+
+        current_price = close[-1]
+
+        return {
+            'upper': safe_float(sma + (std * std_dev), current_price * 1.1),
+            'middle': safe_float(sma, current_price),
+            'lower': safe_float(sma - (std * std_dev), current_price * 0.9),
+            'current': safe_float(current_price, 0)
+        }
+    except Exception:
+        current_price = safe_float(close[-1], 100)
+        return {
+            'upper': current_price * 1.1,
+            'middle': current_price,
+            'lower': current_price * 0.9,
+            'current': current_price
+        }
+
+def calculate_moving_average_crossover(close, short=50, long=200):
+    """Calculate Moving Average Crossover from a close-price array with safe handling"""
+    try:
+        if len(close) < long:
+            short, long = min(5, len(close)//2), min(10, len(close)-1)
+
+        short_val = safe_float(_sma_last(close, short), close[-1])
+        long_val = safe_float(_sma_last(close, long), close[-1])
+
+        return {
+            'short_ma': short_val,
+            'long_ma': long_val,
+            'crossover': short_val > long_val
+        }
+    except Exception:
+        current_price = safe_float(close[-1], 100)
+        return {
+            'short_ma': current_price,
+            'long_ma': current_price,
+            'crossover': False
+        }
+
+def calculate_volatility(close, high, low, period=14):
+    """Calculate Volatility (ATR %) from price arrays with safe handling"""
+    try:
+        if len(close) < period:
+            return 2.0
+
+        high_low = high[1:] - low[1:]
+        high_close = np.abs(high[1:] - close[:-1])
+        low_close = np.abs(low[1:] - close[:-1])
+        true_range = np.maximum.reduce([high_low, high_close, low_close])
+
+        current_price = safe_float(close[-1], 100)
+        atr_val = safe_float(_sma_last(true_range, period), current_price * 0.02)
+
+        if current_price <= 0:
+            return 2.0
+
+        volatility_pct = (atr_val / current_price) * 100
+        return safe_float(volatility_pct, 2.0)
+    except Exception:
+        return 2.0
+
+def _compute_indicators_numpy(close, high, low):
+    """Per-indicator NumPy path, used when numba is unavailable"""
+    return {
+        'rsi': calculate_rsi(close),
+        'macd': calculate_macd(close),
+        'moving_average': calculate_moving_average_crossover(close),
+        'bollinger_bands': calculate_bollinger_bands(close),
+        'volatility': calculate_volatility(close, high, low)
+    }
+
+def _compute_all_indicators(close, high, low):
+    """Compute every indicator in one pass over shared price arrays"""
+    if not _HAS_KERNEL:
+        return _compute_indicators_numpy(close, high, low)
+    try:
+        n = len(close)
+        short, long = 50, 200
+        if n < long:
+            short, long = min(5, n // 2), min(10, n - 1)
+
+        avg_gain, avg_loss, bb_mean, bb_std, short_ma, long_ma, atr = \
+            _indicator_kernel(close, high, low, 14, 20, short, long, 14)
+
+        # Inputs were scrubbed by _history_entry, so the kernel's scalars
+        # are finite and need no per-value safe_float checks
+        if avg_loss == 0:
+            avg_loss = 0.01
+        rsi = 100 - (100 / (1 + avg_gain / avg_loss))
+
+        current_price = float(close[-1])
+        short_val = float(short_ma)
+        long_val = float(long_ma)
+
+        if current_price > 0:
+            volatility = (atr / current_price) * 100
+        else:
+            volatility = 2.0
+
+        return {
+            'rsi': rsi,
+            'macd': calculate_macd(close),
+            'moving_average': {
+                'short_ma': short_val,
+                'long_ma': long_val,
+                'crossover': short_val > long_val
+            },
+            'bollinger_bands': {
+                'upper': bb_mean + 2 * bb_std,
+                'middle': bb_mean,
+                'lower': bb_mean - 2 * bb_std,
+                'current': current_price
+            },
+            'volatility': volatility
+        }
+    except Exception:
+        return _compute_indicators_numpy(close, high, low)
+
+def get_indicator_signals(indicators):
+    """Get individual indicator signals"""
+    signals = {}
+    
+    # RSI Signal
+    rsi = indicators['rsi']
+    if rsi < 30:
+        signals['rsi'] = 'Buy'
+    elif rsi > 70:
+        signals['rsi'] = 'Sell'
+    else:
+        signals['rsi'] = 'Hold'
+    
+    # MACD Signal
+    macd_data = indicators['macd']
+    if macd_data['macd'] > macd_data['signal'] and macd_data['histogram'] > 0:
+        signals['macd'] = 'Buy'
+    elif macd_data['macd'] < macd_data['signal'] and macd_data['histogram'] < 0:
+        signals['macd'] = 'Sell'
+    else:
+        signals['macd'] = 'Hold'
+    
+    # Moving Average Signal
+    ma_data = indicators['moving_average']
+    if ma_data['crossover']:
+        signals['moving_average'] = 'Buy'
+    else:
+        signals['moving_average'] = 'Sell'
+    
+    # Bollinger Bands Signal
+    bb_data = indicators['bollinger_bands']
+    if bb_data['current'] < bb_data['lower']:
+        signals['bollinger_bands'] = 'Buy'
+    elif bb_data['current'] > bb_data['upper']:
+        signals['bollinger_bands'] = 'Sell'
+    else:
+        signals['bollinger_bands'] = 'Hold'
+    
+    # Volatility Signal
+    volatility = indicators['volatility']
+    if volatility > 5:
+        signals['volatility'] = 'Sell'
+    elif volatility < 2:
+        signals['volatility'] = 'Buy'
+    else:
+        signals['volatility'] = 'Hold'
+    
+    return signals
+
+def _signal_votes(signals):
+    """Count (buy, sell, hold) votes in one pass over the signals"""
+    buy_count = sell_count = hold_count = 0
+    for signal in signals.values():
+        if signal == 'Buy':
+            buy_count += 1
+        elif signal == 'Sell':
+            sell_count += 1
+        else:
+            hold_count += 1
+    return buy_count, sell_count, hold_count
+
+def calculate_final_suggestion(signals):
+    """Calculate final suggestion based on priority system"""
+    buy_count, sell_count, _ = _signal_votes(signals)
+
+    if buy_count >= 3:
+        return 'Strong Buy'
+    elif sell_count >= 3:
+        return 'Strong Sell'
+    elif buy_count > sell_count:
+        return 'Buy'
+    elif sell_count > buy_count:
+        return 'Sell'
+    else:
+        return 'Hold'
+
+# Comprehensive Indian stocks database as (symbol, name) rows; kept as
+# plain tuples and split into parallel columns below (structure of arrays)
+# so iteration touches compact strings instead of per-row dicts
+INDIAN_STOCKS = [
+    ('RELIANCE.NS', 'Reliance Industries Ltd'),
+    ('TCS.NS', 'Tata Consultancy Services Ltd'),
+    ('HDFCBANK.NS', 'HDFC Bank Ltd'),
+    ('ICICIBANK.NS', 'ICICI Bank Ltd'),
+    ('SBIN.NS', 'State Bank of India'),
+    ('INFY.NS', 'Infosys Ltd'),
+    ('HINDUNILVR.NS', 'Hindustan Unilever Ltd'),
+    ('ITC.NS', 'ITC Ltd'),
+    ('KOTAKBANK.NS', 'Kotak Mahindra Bank Ltd'),
+    ('AXISBANK.NS', 'Axis Bank Ltd'),
+    ('LT.NS', 'Larsen & Toubro Ltd'),
+    ('WIPRO.NS', 'Wipro Ltd'),
+    ('MARUTI.NS', 'Maruti Suzuki India Ltd'),
+    ('BAJFINANCE.NS', 'Bajaj Finance Ltd'),
+    ('HCLTECH.NS', 'HCL Technologies Ltd'),
+    ('ASIANPAINT.NS', 'Asian Paints Ltd'),
+    ('BHARTIARTL.NS', 'Bharti Airtel Ltd'),
+    ('SUNPHARMA.NS', 'Sun Pharmaceutical Industries Ltd'),
+    ('TITAN.NS', 'Titan Company Ltd'),
+    ('ULTRACEMCO.NS', 'UltraTech Cement Ltd'),
+    ('NESTLEIND.NS', 'Nestle India Ltd'),
+    ('POWERGRID.NS', 'Power Grid Corporation of India Ltd'),
+    ('NTPC.NS', 'NTPC Ltd'),
+    ('ONGC.NS', 'Oil and Natural Gas Corporation Ltd'),
+    ('TATASTEEL.NS', 'Tata Steel Ltd'),
+    ('TECHM.NS', 'Tech Mahindra Ltd'),
+    ('JSWSTEEL.NS', 'JSW Steel Ltd'),
+    ('INDUSINDBK.NS', 'IndusInd Bank Ltd'),
+    ('DRREDDY.NS', 'Dr. Reddy\'s Laboratories Ltd'),
+    ('CIPLA.NS', 'Cipla Ltd'),
+    ('ADANIPORTS.NS', 'Adani Ports and SEZ Ltd'),
+    ('ADANIGREEN.NS', 'Adani Green Energy Ltd'),
+    ('BAJAJ-AUTO.NS', 'Bajaj Auto Ltd'),
+    ('BPCL.NS', 'Bharat Petroleum Corporation Ltd'),
+    ('COALINDIA.NS', 'Coal India Ltd'),
+    ('DIVISLAB.NS', 'Divi\'s Laboratories Ltd'),
+    ('EICHERMOT.NS', 'Eicher Motors Ltd'),
+    ('GRASIM.NS', 'Grasim Industries Ltd'),
+    ('HDFCLIFE.NS', 'HDFC Life Insurance Company Ltd'),
+    ('HEROMOTOCO.NS', 'Hero MotoCorp Ltd'),
+    ('HINDALCO.NS', 'Hindalco Industries Ltd'),
+    ('IOC.NS', 'Indian Oil Corporation Ltd'),
+    ('M&M.NS', 'Mahindra & Mahindra Ltd'),
+    ('SBILIFE.NS', 'SBI Life Insurance Company Ltd'),
+    ('TATACONSUM.NS', 'Tata Consumer Products Ltd'),
+    ('TATAMOTORS.NS', 'Tata Motors Ltd'),
+    ('UPL.NS', 'UPL Ltd'),
+    ('VEDL.NS', 'Vedanta Ltd'),
+    ('APOLLOHOSP.NS', 'Apollo Hospitals Enterprise Ltd'),
+    ('BRITANNIA.NS', 'Britannia Industries Ltd'),
+    ('DABUR.NS', 'Dabur India Ltd'),
+    ('GODREJCP.NS', 'Godrej Consumer Products Ltd'),
+    ('MARICO.NS', 'Marico Ltd'),
+    ('PIDILITIND.NS', 'Pidilite Industries Ltd'),
+    ('DMART.NS', 'Avenue Supermarts Limited'),
+    ('BANDHANBNK.NS', 'Bandhan Bank Ltd'),
+    ('FEDERALBNK.NS', 'Federal Bank Ltd'),
+    ('IDFCFIRSTB.NS', 'IDFC First Bank Ltd'),
+    ('PNB.NS', 'Punjab National Bank'),
+    ('CANBK.NS', 'Canara Bank'),
+    ('BANKBARODA.NS', 'Bank of Baroda'),
+    ('YESBANK.NS', 'Yes Bank Ltd'),
+    ('MINDTREE.NS', 'Mindtree Ltd'),
+    ('MPHASIS.NS', 'Mphasis Ltd'),
+    ('LTI.NS', 'L&T Infotech Ltd'),
+    ('COFORGE.NS', 'Coforge Ltd'),
+    ('ASHOKLEY.NS', 'Ashok Leyland Ltd'),
+    ('TVSMOTOR.NS', 'TVS Motor Company Ltd'),
+    ('BAJAJFINSV.NS', 'Bajaj Finserv Ltd'),
+    ('LUPIN.NS', 'Lupin Ltd'),
+    ('BIOCON.NS', 'Biocon Ltd'),
+    ('CADILAHC.NS', 'Cadila Healthcare Ltd'),
+    ('TORNTPHARM.NS', 'Torrent Pharmaceuticals Ltd'),
+    ('COLPAL.NS', 'Colgate Palmolive India Ltd'),
+    ('JUBLFOOD.NS', 'Jubilant FoodWorks Ltd'),
+    ('ZEEL.NS', 'Zee Entertainment Enterprises Ltd'),
+    ('SAIL.NS', 'Steel Authority of India Ltd'),
+    ('GMRINFRA.NS', 'GMR Infrastructure Ltd'),
+    ('RPOWER.NS', 'Reliance Power Ltd'),
+    ('SUZLON.NS', 'Suzlon Energy Ltd'),
+    ('FORCEMOT.NS', 'Force Motors Ltd'),
+]
+
+_STOCK_SYMBOLS, _STOCK_NAMES = (tuple(column) for column in zip(*INDIAN_STOCKS))
+
+# Precomputed uppercase symbol/name/name-words and a word-prefix index
+# built once at import, so /search does a dict lookup per keystroke and
+# never uppercases or splits anything inside the match loop
+_STOCKS_UPPER = [(symbol.upper(), name.upper(), tuple(name.upper().split()))
+                 for symbol, name in INDIAN_STOCKS]
+_PREFIX_INDEX = defaultdict(list)
+for _i, (_symbol, _name, _words) in enumerate(_STOCKS_UPPER):
+    for _word in (_symbol,) + _words:
+        for _k in (2, 3, 4):
+            if len(_word) >= _k:
+                entries = _PREFIX_INDEX[_word[:_k]]
+                if not entries or entries[-1] != _i:
+                    entries.append(_i)
+
+# Shared pool for firing the Yahoo Finance search off-thread while the
+# local index lookup runs
+_SEARCH_EXECUTOR = ThreadPoolExecutor(max_workers=4)
+
+# Pooled HTTP session so repeated Yahoo searches reuse one TCP+TLS
+# connection instead of paying the handshake on every request
+_YF_SESSION = requests.Session()
+_YF_SESSION.headers.update({
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+})
+_YF_SESSION.mount('https://', requests.adapters.HTTPAdapter(pool_connections=10, pool_maxsize=10))
+
+_YF_SEARCH_URL = "https://query1.finance.yahoo.com/v1/finance/search?q={}&quotesCount=10&newsCount=0"
+
+def search_yahoo_finance_api(query):
+    """Search using Yahoo Finance API with proper error handling"""
+    try:
+        response = _YF_SESSION.get(_YF_SEARCH_URL.format(quote_plus(query)), timeout=5)
+        
+        if response.status_code == 200:
+            data = response.json()
+            stocks = []
+            
+            for quote in data.get('quotes', []):
+                symbol = quote.get('symbol', '')
+                if symbol.endswith(('.NS', '.BO')):
+                    stocks.append({
+                        'symbol': symbol,
+                        'name': quote.get('longname', quote.get('shortname', symbol))
+                    })
+            
+            return stocks
+        else:
+            return []
+            
+    except Exception as e:
+        return []
+
+@app.route('/search', methods=['GET'])
+def search_stocks():
+    """Search stocks with fallback to local database"""
+    query = request.args.get('q', '').strip().upper()
+    
+    if len(query) < 2:
+        return jsonify([])
+    
+    try:
+        # Kick off the Yahoo Finance API call in the background
+        live_future = _SEARCH_EXECUTOR.submit(search_yahoo_finance_api, query)
+
+        # Search local database: try the prefix index first, fall back to a
+        # full substring scan only when the prefix is unknown
+        candidates = None
+        for k in (4, 3, 2):
+            candidates = _PREFIX_INDEX.get(query[:k])
+            if candidates is not None:
+                break
+        if candidates is None:
+            candidates = range(len(_STOCK_SYMBOLS))
+
+        local_results = []
+        for i in candidates:
+            symbol_upper, name_upper, name_words = _STOCKS_UPPER[i]
+            if (query in symbol_upper or
+                query in name_upper or
+                any(word.startswith(query) for word in name_words)):
+                local_results.append({'symbol': _STOCK_SYMBOLS[i], 'name': _STOCK_NAMES[i]})
+
+        # Bounded join: local results return promptly even when Yahoo
+        # stalls; the background call keeps its own 5 s timeout and may
+        # still finish to warm the connection
+        try:
+            live_results = live_future.result(timeout=1)
+        except Exception:
+            live_results = []
+
+        # Combine and remove duplicates
+        all_results = live_results + local_results
+        seen = set()
+        unique_results = []
+        for stock in all_results:
+            if stock['symbol'] not in seen:
+                seen.add(stock['symbol'])
+                unique_results.append(stock)
+        
+        return jsonify(unique_results[:10])
+        
+    except Exception as e:
+        return jsonify({'error': f'Search failed: {str(e)}'}), 500
+
+def _build_analysis(symbol, company_name, close, high, low):
+    """Assemble the full /analyze payload for one symbol's price arrays"""
+    current_price = safe_float(close[-1], 0)
+
+    indicators = _compute_all_indicators(close, high, low)
+
+    signals = get_indicator_signals(indicators)
+    final_suggestion = calculate_final_suggestion(signals)
+    buy_count, sell_count, hold_count = _signal_votes(signals)
+
+    return {
+        'stock': symbol,
+        'company_name': company_name,
+        'current_price': round(current_price, 2),
+        'indicators': {
+            'rsi': {
+                'value': round(indicators['rsi'], 2),
+                'signal': signals['rsi']
+            },
+            'macd': {
+                'value': round(indicators['macd']['histogram'], 4),
+                'signal': signals['macd']
+            },
+            'moving_average': {
+                'short_ma': round(indicators['moving_average']['short_ma'], 2),
+                'long_ma': round(indicators['moving_average']['long_ma'], 2),
+                'signal': signals['moving_average']
+            },
+            'bollinger_bands': {
+                'current': round(indicators['bollinger_bands']['current'], 2),
+                'upper': round(indicators['bollinger_bands']['upper'], 2),
+                'lower': round(indicators['bollinger_bands']['lower'], 2),
+                'signal': signals['bollinger_bands']
+            },
+            'volatility': {
+                'value': round(indicators['volatility'], 2),
+                'signal': signals['volatility']
+            }
+        },
+        'final_suggestion': final_suggestion,
+        'signal_summary': {
+            'buy_count': buy_count,
+            'sell_count': sell_count,
+            'hold_count': hold_count
+        }
+    }
+
+@lru_cache(maxsize=4096)
+def _cached_analysis(symbol, company_name, last_bar, last_close):
+    """Memoized /analyze payload for daily bars.
+
+    Keyed on the last bar date and close so a new trading day or a
+    corporate-action price adjustment invalidates the entry; the price
+    arrays themselves come from the history TTL cache. If that entry
+    expired in the meantime it is refetched here rather than memoizing
+    a miss for the rest of the trading day (a fetch failure raises and
+    is never cached).
+    """
+    with _CACHE_LOCK:
+        entry = _HIST_CACHE.get(symbol)
+    if entry is None:
+        entry = _fetch_history(symbol)
+    close, high, low, _ = entry
+    return _build_analysis(symbol, company_name, close, high, low)
+
+@app.route('/analyze', methods=['POST'])
+def analyze():
+    """Analyze stock with comprehensive error handling"""
+    try:
+        data = request.get_json()
+        if not data:
+            return jsonify({'error': 'No JSON data provided'}), 400
+        
+        symbol = data.get('symbol')
+        if not symbol:
+            return jsonify({'error': 'No stock symbol provided'}), 400
+        
+        # Fetch stock data from Yahoo Finance (served from cache when fresh)
+        close, high, low, last_bar = _fetch_history(symbol)
+
+        if len(close) < 20:
+            return jsonify({'error': f'Insufficient data for {symbol}. Stock may not exist.'}), 400
+
+        # Same history means the same analysis, so let the browser cache it
+        etag = f'{symbol}-{last_bar}'
+        if request.if_none_match.contains(etag):
+            return '', 304
+
+        current_price = safe_float(close[-1], 0)
+
+        if current_price <= 0:
+            return jsonify({'error': f'Invalid price data for {symbol}'}), 400
+
+        company_name = _get_company_name(symbol)
+
+        response_data = _cached_analysis(symbol, company_name, last_bar, float(close[-1]))
+
+        response = jsonify(response_data)
+        response.set_etag(etag)
+        return response
+
+    except Exception as e:
+        return jsonify({'error': f'Analysis failed: {str(e)}'}), 500
+
+@app.route('/analyze_batch', methods=['POST'])
+def analyze_batch():
+    """Analyze several stocks with one batched Yahoo Finance download"""
+    try:
+        data = request.get_json()
+        if not data:
+            return jsonify({'error': 'No JSON data provided'}), 400
+
+        symbols = data.get('symbols')
+        if not symbols or not isinstance(symbols, list):
+            return jsonify({'error': 'No stock symbols provided'}), 400
+        symbols = [str(s) for s in symbols[:50]]
+
+        # One threaded download covers every symbol the cache cannot serve
+        with _CACHE_LOCK:
+            missing = [s for s in symbols if s not in _HIST_CACHE]
+        if missing:
+            df = yf.download(tickers=' '.join(missing), period='1y',
+                             group_by='ticker', threads=True, progress=False)
+            for symbol in missing:
+                try:
+                    hist = df[symbol].dropna() if isinstance(df.columns, pd.MultiIndex) else df.dropna()
+                except KeyError:
+                    continue
+                _store_history(symbol, hist)
+
+        results = []
+        errors = {}
+        for symbol in symbols:
+            with _CACHE_LOCK:
+                entry = _HIST_CACHE.get(symbol)
+                company_name = _INFO_CACHE.get(symbol, symbol)
+            if entry is None or len(entry[0]) < 20:
+                errors[symbol] = f'Insufficient data for {symbol}. Stock may not exist.'
+                continue
+            close, high, low, last_bar = entry
+            if safe_float(close[-1], 0) <= 0:
+                errors[symbol] = f'Invalid price data for {symbol}'
+                continue
+            results.append(_cached_analysis(symbol, company_name, last_bar, float(close[-1])))
+
+        return jsonify({'results': results, 'errors': errors})
+
+    except Exception as e:
+        return jsonify({'error': f'Batch analysis failed: {str(e)}'}), 500
+
+@app.route('/')
+def home():
+    return "API is working"
+
+
+
+# Development server only; in production run under gunicorn's gevent
+# workers instead: gunicorn -c gunicorn_conf.py app:app
+if __name__ == '__main__':
+    app.run(host='0.0.0.0', port=int(os.environ.get("PORT", 10000)))
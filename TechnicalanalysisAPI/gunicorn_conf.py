@@ -0,0 +1,27 @@
+"""Gunicorn configuration for production.
+
+Run with: gunicorn -c gunicorn_conf.py app:app
+
+The gevent worker class cooperatively schedules the outbound Yahoo
+Finance calls, so one worker keeps serving requests while others wait
+on the network.
+"""
+# Patch the stdlib before anything else: with preload_app the master
+# imports app.py (and with it ssl, threading, requests) before the
+# gevent worker's own patch_all() would run, which gevent warns breaks
+# TLS. This config module is imported ahead of the preloaded app, so
+# patching here is early enough.
+from gevent import monkey
+monkey.patch_all()
+
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 10000)}"
+worker_class = 'gevent'
+workers = 2 * multiprocessing.cpu_count() + 1
+worker_connections = 1000
+timeout = 30
+# Import the app (and warm the numba kernel) once before forking so
+# workers share the compiled code via copy-on-write
+preload_app = True
@@ -0,0 +1,54 @@
+"""Fused indicator kernel shared by app.py and build_indicators.py.
+
+Kept free of Flask/yfinance imports so the build script can import it
+without dragging the web app along. app.py jit-compiles it with numba at
+import time, hitting the persistent cache that build_indicators.py
+seeds during image assembly.
+"""
+import math
+
+
+def indicator_kernel(close, high, low, rsi_period, bb_period, short_w, long_w, atr_period):
+    """Fused last-window statistics for every SMA-based indicator"""
+    n = close.shape[0]
+
+    gain_sum = 0.0
+    loss_sum = 0.0
+    for i in range(n - rsi_period, n):
+        d = close[i] - close[i - 1]
+        if d > 0:
+            gain_sum += d
+        else:
+            loss_sum -= d
+
+    bb_sum = 0.0
+    for i in range(n - bb_period, n):
+        bb_sum += close[i]
+    bb_mean = bb_sum / bb_period
+    sq_sum = 0.0
+    for i in range(n - bb_period, n):
+        d = close[i] - bb_mean
+        sq_sum += d * d
+    bb_std = math.sqrt(sq_sum / (bb_period - 1 if bb_period > 1 else 1))
+
+    short_sum = 0.0
+    for i in range(n - short_w, n):
+        short_sum += close[i]
+    long_sum = 0.0
+    for i in range(n - long_w, n):
+        long_sum += close[i]
+
+    tr_sum = 0.0
+    for i in range(n - atr_period, n):
+        hl = high[i] - low[i]
+        hc = abs(high[i] - close[i - 1])
+        lc = abs(low[i] - close[i - 1])
+        tr = hl if hl > hc else hc
+        if lc > tr:
+            tr = lc
+        tr_sum += tr
+
+    return (gain_sum / rsi_period, loss_sum / rsi_period,
+            bb_mean, bb_std,
+            short_sum / short_w, long_sum / long_w,
+            tr_sum / atr_period)